@@ -15,10 +15,9 @@ if __name__ == "__main__":
     data_streamer = SimDataStreamer.from_dataset_path(dataset_path=dataset_path)
 
     debugger = FeatureMatchDebugger.from_defaults()
+    matcher = OrbBasedFeatureMatcher.build()
 
     for obs in data_streamer.stream():
-        matcher = OrbBasedFeatureMatcher.build()
-
         im_left = obs.left_eye_img
         im_right = obs.right_eye_img
 
@@ -27,9 +27,11 @@ from sim.sample_scenes import get_two_triangle_scene
 from utils.profiling import just_time
 from vslam.pnp import (
     estimate_J_numerically,
-    estimate_J_analytically,
     gauss_netwon_pnp,
     _compute_reprojection_error,
+    _jacobian_of_points_in_cam,
+    _reprojection_error_of_points_in_cam,
+    _to_cam_coords,
 )
 from vslam.poses import get_SE3_pose
 from vslam.transforms import SE3_inverse, get_world_to_cam_coord_flip_matrix
@@ -129,9 +131,10 @@ def _overfit_one_point():
     print("Remember it's one point only so we can easily get incorrect solution")
 
 
-def _solve_many_points_first_order_descent(verbose: bool = True):
-    """Naive method: numerical derivative, direct gradient.
+def _solve_many_points_first_order_descent(verbose: bool = True, verify_jacobian: bool = True):
+    """Naive method: analytic derivative, direct gradient.
     On the way there, make sure that analytic and numeric jacobians are close to each other.
+    Numeric jacobian is ~6 extra reprojections per point, so we check it only on the first iteration.
     """
     data = _PoseEstimationData.example()
 
@@ -140,30 +143,27 @@ def _solve_many_points_first_order_descent(verbose: bool = True):
     points_3d = data.points_3d_in_keyframe
 
     for i in range(4000):
-        Js, errs, dxs, jac_err = [], [], [], []
-
-        for point_2d, point_3d in zip(points_2d, points_3d):
-            J_num = estimate_J_numerically(point_3d, point_2d, camera_pose)
-            J = estimate_J_analytically(point_3d, camera_pose)
-
-            e = _compute_reprojection_error(point_3d, point_2d, camera_pose)
-            dx = J @ e
-            jac_err.append(np.abs(J - J_num).sum())
-            Js.append(J)
-            errs.append(e)
-            dxs.append(dx)
-
-        dx_est = np.array(dxs).mean(axis=0)
-        mean_abs_jac_err = np.array(jac_err).mean()
-        loss = np.linalg.norm(np.array(errs), axis=1).mean()
-        camera_pose = camera_pose @ SE3Matrix.exp(-dx_est).as_matrix()
-
-        assert mean_abs_jac_err < 1e-4
+        # all points at once, transformed to camera once: J is (N, 3, 2), errs are (N, 2)
+        points_in_cam = _to_cam_coords(points_3d, camera_pose)
+        J = _jacobian_of_points_in_cam(points_in_cam)
+        errs = _reprojection_error_of_points_in_cam(points_in_cam, points_2d)
+
+        if i == 0 and verify_jacobian:
+            J_num = estimate_J_numerically(points_3d, points_2d, camera_pose)
+            # analytic jacobian covers only the planar (x, y, yaw) degrees of freedom
+            mean_abs_jac_err = np.abs(J - J_num[:, [0, 1, 5], :]).sum(axis=(1, 2)).mean()
+            assert mean_abs_jac_err < 1e-4, f"{mean_abs_jac_err=}"
+            if verbose:
+                print(f"jac_err = {mean_abs_jac_err:.5f}")
+
+        # sum of per-point steps J @ e, contracted directly without materializing the (N, 3) steps
+        dx_est = np.einsum('nij,nj->i', J, errs) / len(points_3d)
+        loss = np.linalg.norm(errs, axis=1).mean()
+        real_dx = np.array([dx_est[0], dx_est[1], 0, 0, 0, dx_est[2]])
+        camera_pose = camera_pose @ SE3Matrix.exp(-real_dx).as_matrix()
 
         if verbose and i % 10 == 0:
-            print(
-                f"i = {i} mse = {loss:.2f} dx = {dx_est.round(2)} jac_err = {mean_abs_jac_err:.5f}"
-            )
+            print(f"i = {i} mse = {loss:.2f} dx = {dx_est.round(2)}")
 
     print("Final pose estimate is")
     print(camera_pose.round(2))
@@ -178,20 +178,21 @@ def _solve_many_points_gauss_newton(verbose: bool = False):
     """Pose estimation that is somewhat close to production:
     1) Gauss newton second order method
     2) analytical gradient
-    not vectrorized though!
+    3) normal equations accumulated over all points at once
     """
 
     data = _PoseEstimationData.example()
 
-    camera_pose = gauss_netwon_pnp(
+    camera_pose, _ = gauss_netwon_pnp(
         data.camera_pose_initial_guess,
         data.points_3d_in_keyframe,
         data.points_2d_in_img,
+        outlier_rejection_margin=np.inf,   # initial guess is far off, so every point would look like an outlier
         verbose=True,
     )
 
     print("Final pose estimate is")
-    print(np.array(camera_pose).round(2))
+    print(camera_pose.round(2))
     print("Ground truth pose is ")
     print(data.camera_pose.round(2))
 
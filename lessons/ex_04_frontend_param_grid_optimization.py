@@ -1,6 +1,9 @@
 import itertools
+import multiprocessing
 import os
+from typing import Dict, List, Optional, Tuple
 
+import attr
 import numpy as np
 import pandas as pd
 import tqdm
@@ -8,6 +11,7 @@ import tqdm
 from defs import ROOT_DIR
 from vslam.datasets.simdata import SimDataStreamer
 from vslam.debug import LocalizationDebugger
+from vslam.features import OrbBasedFeatureMatcher
 from vslam.frontend import Frontend
 from vslam.poses import get_SE3_pose
 from vslam.running import ResultRecorder, run_slam_system, SlamPerformanceMetrics
@@ -42,10 +46,44 @@ def run_couple_first_frames(
         localization_debugger_or_none = LocalizationDebugger.from_scene(
             scene=data_streamer.recorded_data.scene,
             cam_specs=data_streamer.get_cam_specs()
-        ) if show else None
+        ) if show else None,
+        show_progress=show   # hundreds of runs in the sweep, progress bars would just spam the terminal
     )
 
 
+_worker_data_streamer: Optional[SimDataStreamer] = None
+
+
+def _init_worker(data_streamer: SimDataStreamer):
+    """ Every worker receives the already decoded observations once, instead of per job. """
+    global _worker_data_streamer
+    _worker_data_streamer = data_streamer
+
+
+def count_tracking_matches_per_matcher_params(
+    data_streamer: SimDataStreamer,
+    max_px_distances: List[float],
+    max_hamming_distances: List[int],
+) -> Dict[Tuple[float, int], int]:
+    """ Cheap dry run: match the first frame against the second one, like keyframe tracking would,
+    for every (max_px_distance, max_hamming_distance) pair. Consecutive frames are the easy case,
+    so a pair that gets fewer matches here than any minimum_number_of_matches we sweep is hopeless. """
+    first_obs, second_obs = itertools.islice(data_streamer.stream(), 2)
+    detector = OrbBasedFeatureMatcher.build()
+    first_detections = detector.detect(first_obs.left_eye_img)
+    second_detections = detector.detect(second_obs.left_eye_img)
+
+    counts = {}
+    for max_px_distance, max_hamming_distance in itertools.product(max_px_distances, max_hamming_distances):
+        matcher = attr.evolve(detector, max_px_distance=max_px_distance, max_hamming_distance=max_hamming_distance)
+        counts[(max_px_distance, max_hamming_distance)] = len(matcher.match(first_detections, second_detections))
+    return counts
+
+
+def _run_one(params: Tuple) -> Tuple[Tuple, SlamPerformanceMetrics]:
+    return params, run_couple_first_frames(_worker_data_streamer, *params)
+
+
 if __name__ == "__main__":
     # dataset_path = os.path.join(ROOT_DIR, 'data/short_recording_2023-04-01--22-41-24.msgpack')   # short
     dataset_path = os.path.join(
@@ -53,7 +91,8 @@ if __name__ == "__main__":
         # ROOT_DIR, "data/short_recording_2023-04-18--20-43-48.msgpack"  # classic, sparse, unsmooth turns
         ROOT_DIR, "data/short_recording_2023-04-20--22-46-06.msgpack"    # long, many triangles, smooth
     )  # long
-    data_streamer = SimDataStreamer.from_dataset_path(dataset_path=dataset_path, max_obs=130)
+    # decode the msgpack once and keep only the frames we run on
+    data_streamer = SimDataStreamer.from_dataset_path(dataset_path=dataset_path, max_obs=130).materialize()
 
     np.set_printoptions(suppress=True)  # TODO: remove
     max_px_distance = [200.0, 400.0, float('inf')]
@@ -64,6 +103,14 @@ if __name__ == "__main__":
     max_allowed_error = [0.02, 0.05, 0.1]
     outlier_rejection_margin = [0.005, 0.01, 0.02]
 
+    match_counts = count_tracking_matches_per_matcher_params(data_streamer, max_px_distance, max_hamming_distance)
+    usable_matcher_params = {
+        pair for pair, count in match_counts.items() if count >= min(minimum_number_of_matches)
+    }
+    for pair in match_counts.keys() - usable_matcher_params:
+        print(f"skipping (max_px_distance, max_hamming_distance)={pair}, only {match_counts[pair]} matches")
+
+    # no point in running configs which won't be able to track even the second frame
     all_params = [
         params for params in itertools.product(
             max_px_distance,
@@ -74,35 +121,46 @@ if __name__ == "__main__":
             max_allowed_error,
             outlier_rejection_margin
         )
+        if params[:2] in usable_matcher_params
     ]
 
-    metrics_agg = []
+    columns = [
+        "max_px_distance",
+        "max_hamming_distance",
+        "keyframe_max_px_distance",
+        "keyframe_max_hamming_distance",
+        "minimum_number_of_matches",
+        "max_allowed_error",
+        "outlier_rejection_margin",
+        "euclidean_err",
+        "angular_err",
+        "euclidean_diff_err",
+        "angular_diff_err",
+    ]
+    results = np.empty((len(all_params), len(columns)), dtype=np.float64)   # one row per config, params then metrics
     best_euclidean_error_so_far = float('inf')
 
-    for params in tqdm.tqdm(all_params):
-        metrics = run_couple_first_frames(data_streamer, *params)
-        if metrics.sum_euclidean_error < best_euclidean_error_so_far:
-            best_euclidean_error_so_far = metrics.sum_euclidean_error
-            print(f"{best_euclidean_error_so_far=:.3f}")
-            print(params)
-            print('- ' * 40)
-
-        metrics_agg.append(metrics)
-
-    params_again = list(map(list, zip(*all_params)))
-
-    data = pd.DataFrame({
-        "max_px_distance": params_again[0],
-        "max_hamming_distance": params_again[1],
-        "keyframe_max_px_distance": params_again[2],
-        "keyframe_max_hamming_distance": params_again[3],
-        "minimum_number_of_matches": params_again[4],
-        "max_allowed_error": params_again[5],
-        "outlier_rejection_margin": params_again[6],
-        'euclidean_err': [metrics.sum_euclidean_error for metrics in metrics_agg],
-        'angular_err': [metrics.sum_angular_error for metrics in metrics_agg],
-        'euclidean_diff_err': [metrics.sum_euclidean_diff_error for metrics in metrics_agg],
-        'angular_diff_err': [metrics.sum_angular_diff_error for metrics in metrics_agg],
+    # each config is independent, so fan them out over all cores
+    with multiprocessing.Pool(os.cpu_count(), initializer=_init_worker, initargs=(data_streamer,)) as pool:
+        for k, (params, metrics) in enumerate(tqdm.tqdm(pool.imap_unordered(_run_one, all_params), total=len(all_params))):
+            if metrics.sum_euclidean_error < best_euclidean_error_so_far:
+                best_euclidean_error_so_far = metrics.sum_euclidean_error
+                print(f"{best_euclidean_error_so_far=:.3f}")
+                print(params)
+                print('- ' * 40)
+
+            results[k] = (
+                *params,
+                metrics.sum_euclidean_error,
+                metrics.sum_angular_error,
+                metrics.sum_euclidean_diff_error,
+                metrics.sum_angular_diff_error
+            )
+
+    data = pd.DataFrame(results, columns=columns).astype({
+        "max_hamming_distance": int,
+        "keyframe_max_hamming_distance": int,
+        "minimum_number_of_matches": int,
     })
 
     data.to_csv('results.csv', index=False)
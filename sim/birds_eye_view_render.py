@@ -1,4 +1,3 @@
-import copy
 from typing import List, Tuple, Optional
 
 import attr
@@ -7,9 +6,10 @@ import numpy as onp
 from sim.sim_types import RenderTriangle3d
 from utils.colors import BGRCuteColors
 from utils.custom_types import PixelCoordArray, BGRColor, BGRImageArray
-from utils.cv2_but_its_typed import cv2_fill_poly, cv2_line, cv2_circle
+from utils.cv2_but_its_typed import cv2_fill_poly, cv2_line, cv2_circle, cv2_polylines, cv2_lines
 from utils.geometry import Arrow2d
 from utils.image import get_canvas
+from utils.plot import draw_circles_px
 from vslam.cam import CameraIntrinsics
 from vslam.math import normalize_vector
 from vslam.poses import SE3_pose_to_xytheta
@@ -17,6 +17,9 @@ from vslam.transforms import homogenize
 from vslam.types import BGRImageArray, Point2d, Points2d, TransformSE3, Pose2DArray
 
 
+_DEFAULT_GROUND_COLOR = tuple(x - 20 for x in BGRCuteColors.CYAN)
+
+
 @attr.define
 class BirdseyeViewSpecifier:
     """ Parameters for rendering a birdseye view"""
@@ -119,8 +122,13 @@ def draw_view_cone(
     right_px = bev_2d_world_to_pixel(right_homog[:2], view_specifier)
     center_px = bev_2d_world_to_pixel(camera_pose[:2, -1], view_specifier)
 
-    cv2_line(image, left_px, center_px, color=whiskers_color, thickness=whiskers_thickness_px)
-    cv2_line(image, right_px, center_px, color=whiskers_color, thickness=whiskers_thickness_px)
+    cv2_lines(
+        image,
+        onp.array([left_px, right_px]),
+        onp.array([center_px, center_px]),
+        color=whiskers_color,
+        thickness=whiskers_thickness_px
+    )
 
 
 def draw_line_on_bev(
@@ -137,6 +145,30 @@ def draw_line_on_bev(
     cv2_line(image, from_px, to_px, color=color, thickness=thickness)
 
 
+def draw_lines_on_bev(
+    image: BGRImageArray,
+    view_specifier: BirdseyeViewSpecifier,
+    from_pts: Points2d,
+    to_pts: Points2d,
+    color: BGRColor,
+    thickness: int = 1
+):
+    from_px = bev_2d_world_to_pixel(from_pts, view_specifier)
+    to_px = bev_2d_world_to_pixel(to_pts, view_specifier)
+    cv2_lines(image, from_px, to_px, color=color, thickness=thickness)
+
+
+def draw_polyline_on_bev(
+    image: BGRImageArray,
+    view_specifier: BirdseyeViewSpecifier,
+    pts: Points2d,
+    color: BGRColor,
+    thickness: int = 1
+):
+    pts_px = bev_2d_world_to_pixel(pts, view_specifier)
+    cv2_polylines(image, pts_px, color=color, thickness=thickness)
+
+
 def draw_circle_on_bev(
         image: BGRImageArray,
         view_specifier: BirdseyeViewSpecifier,
@@ -149,6 +181,18 @@ def draw_circle_on_bev(
     cv2_circle(image, pt_px, radius, color, thickness)
 
 
+def draw_circles_on_bev(
+        image: BGRImageArray,
+        view_specifier: BirdseyeViewSpecifier,
+        pts: Points2d,
+        radius: int,
+        color: BGRColor,
+        thickness: int = 1
+):
+    pts_px = bev_2d_world_to_pixel(pts, view_specifier)
+    draw_circles_px(image, pts_px[:, ::-1], color, radius, thickness)   # numpy wants h, w
+
+
 def render_birdseye_view(
         view_specifier: BirdseyeViewSpecifier,
         camera_pose: TransformSE3,
@@ -176,16 +220,24 @@ def render_birdseye_view(
 class DisplayBirdseyeView:
     view_specifier: BirdseyeViewSpecifier
     canvas: BGRImageArray
+    ground_color: BGRColor = _DEFAULT_GROUND_COLOR
 
     @classmethod
     def from_view_specifier(
         cls,
         view_specifier: BirdseyeViewSpecifier,
-        ground_color: BGRColor = tuple(x - 20 for x in BGRCuteColors.CYAN)
+        ground_color: BGRColor = _DEFAULT_GROUND_COLOR
     ):
         x_size, y_size = view_specifier.get_pixel_size()
         canvas = get_canvas(shape=(x_size, y_size, 3), background_color=ground_color)
-        return cls(view_specifier, canvas)
+        return cls(view_specifier, canvas, ground_color)
+
+    def reset(self, view_specifier: BirdseyeViewSpecifier) -> None:
+        """ Start over with an empty canvas looking at view_specifier, reusing the canvas buffer.
+        The new view has to have the same pixel size, e.g. the same view moved around. """
+        assert view_specifier.get_pixel_size() == self.view_specifier.get_pixel_size()
+        self.view_specifier = view_specifier
+        self.canvas[...] = onp.array(self.ground_color, dtype=onp.uint8)
 
     def draw_view_cone(
             self,
@@ -208,8 +260,13 @@ class DisplayBirdseyeView:
             color: BGRColor = BGRCuteColors.DARK_GRAY,
             thickness: int = 3
     ):
-        for (from_pt, to_pt) in arrow.get_lines_to_draw():
-            self.draw_line_2d(from_pt, to_pt, color, thickness)
+        lines = arrow.get_lines_to_draw()
+        self.draw_lines_2d(
+            from_pts=onp.array([from_pt for from_pt, _ in lines]),
+            to_pts=onp.array([to_pt for _, to_pt in lines]),
+            color=color,
+            thickness=thickness
+        )
 
     def draw_2d_pose(
             self,
@@ -228,9 +285,7 @@ class DisplayBirdseyeView:
         arrow_length: float = 0.15,
         thickness: int = 2
     ):
-        pose_2d = SE3_pose_to_xytheta(pose)
-        arrow = Arrow2d.from_length_and_origin(origin=pose_2d[:2], length=arrow_length, orientation=pose_2d[2])
-        self.draw_arrow(arrow, color, thickness)
+        self.draw_2d_pose(SE3_pose_to_xytheta(pose), color, arrow_length, thickness)
 
     def draw_line_2d(
             self,
@@ -248,6 +303,38 @@ class DisplayBirdseyeView:
             thickness
         )
 
+    def draw_lines_2d(
+            self,
+            from_pts: Points2d,
+            to_pts: Points2d,
+            color: BGRColor,
+            thickness: int = 1
+    ):
+        """ Like draw_line_2d for every (from, to) pair, in a single opencv call. """
+        draw_lines_on_bev(
+            self.canvas,
+            self.view_specifier,
+            from_pts,
+            to_pts,
+            color,
+            thickness
+        )
+
+    def draw_polyline_2d(
+            self,
+            pts: Points2d,
+            color: BGRColor,
+            thickness: int = 1
+    ):
+        """ Connects consecutive points, like draw_line_2d for each pair. """
+        draw_polyline_on_bev(
+            self.canvas,
+            self.view_specifier,
+            pts,
+            color,
+            thickness
+        )
+
     def draw_circle(
             self,
             pt: Point2d,
@@ -264,6 +351,23 @@ class DisplayBirdseyeView:
             thickness
         )
 
+    def draw_circles(
+            self,
+            pts: Points2d,
+            color: BGRColor,
+            radius: int = 1,
+            thickness: int = 1
+    ):
+        """ Like draw_circle for every point, but stamped all at once. """
+        draw_circles_on_bev(
+            self.canvas,
+            self.view_specifier,
+            pts,
+            radius,
+            color,
+            thickness
+        )
+
     def draw_triangles(
         self,
         triangles: List[RenderTriangle3d],
@@ -280,4 +384,5 @@ class DisplayBirdseyeView:
         return self.canvas
 
     def clone(self):
-        return copy.deepcopy(self)
\ No newline at end of file
+        # only the canvas is ever drawn on, the view specifier is never mutated so it can be shared
+        return attr.evolve(self, canvas=self.canvas.copy())
\ No newline at end of file
@@ -92,3 +92,28 @@ def cv2_line(
 ) -> BGRImageArray:
     cv2.line(image, start_point, end_point, color, thickness)
     return image
+
+
+def cv2_polylines(
+    image: BGRImageArray,
+    pts: Array['N,2', np.int32],   # mind the opencv coordinate flip
+    color: BGRColor,
+    thickness: int,
+    is_closed: bool = False
+) -> BGRImageArray:
+    """ Same as cv2_line between every pair of consecutive points, but in one call. """
+    cv2.polylines(image, [np.ascontiguousarray(pts, dtype=np.int32)], is_closed, color, thickness)
+    return image
+
+
+def cv2_lines(
+    image: BGRImageArray,
+    start_points: Array['N,2', np.int32],   # mind the opencv coordinate flip
+    end_points: Array['N,2', np.int32],
+    color: BGRColor,
+    thickness: int
+) -> BGRImageArray:
+    """ Same as cv2_line for every (start, end) pair, but all segments go to opencv in one call. """
+    segments = np.stack([start_points, end_points], axis=1).astype(np.int32)   # (N, 2, 2), one polyline per segment
+    cv2.polylines(image, list(segments), False, color, thickness)
+    return image
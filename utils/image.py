@@ -1,4 +1,5 @@
-from typing import Tuple
+import contextlib
+from typing import Tuple, Iterator
 
 import cv2
 import numpy as onp
@@ -30,11 +31,38 @@ def take_crop_around(
     return onp.copy(img[from_h:to_h, from_w:to_w])
 
 
+@contextlib.contextmanager
+def restore_patch_on_exit(
+    img: BGRImageArray,
+    around_point: Tuple[int, int],  # h, w
+    radius: int,
+) -> Iterator[BGRImageArray]:
+    """
+    with restore_patch_on_exit(img, around_point=(h, w), radius=12):
+        draw_something_small(img, around=(h, w))
+        use(img)
+    # img is back to how it was, but we have copied only the patch, not the whole image
+    """
+    h, w = around_point
+    im_h, im_w = img.shape[:2]
+
+    from_h, to_h = max(0, h - radius), min(im_h, h + radius + 1)
+    from_w, to_w = max(0, w - radius), min(im_w, w + radius + 1)
+
+    patch = onp.copy(img[from_h:to_h, from_w:to_w])
+    try:
+        yield img
+    finally:
+        img[from_h:to_h, from_w:to_w] = patch
+
+
 def get_canvas(
     shape: Tuple[HeightPx, WidthPx, Channels],
     background_color: BGRColor = BGRCuteColors.DARK_BLUE
 ) -> BGRImageArray:
-    return onp.ones(shape, dtype=onp.uint8) * onp.array(background_color, dtype=onp.uint8)
+    canvas = onp.empty(shape, dtype=onp.uint8)
+    canvas[...] = onp.array(background_color, dtype=onp.uint8)   # broadcast fill, no temporary
+    return canvas
 
 
 def just_show(img: BGRImageArray, title: str = 'image'):
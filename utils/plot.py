@@ -1,10 +1,12 @@
+import functools
 from typing import Tuple, Dict, List, Union, Protocol, runtime_checkable, Generator
 
 import attr
 import cv2
+import numpy as np
 
 from utils.colors import BGRCuteColors, BGRColor
-from utils.custom_types import ImageArray, BGRImageArray, HeightPx, WidthPx, Pixel
+from utils.custom_types import Array, ImageArray, BGRImageArray, HeightPx, WidthPx, Pixel
 from utils.cv2_but_its_typed import cv2_get_text_size, cv2_line
 from utils.enum_utils import StrEnum
 from utils.image import get_canvas
@@ -231,6 +233,63 @@ def draw_cross_px(
     cv2_line(image, from_px, to_px, color, thickness)
 
 
+def draw_crosses_px(
+    image: BGRImageArray,
+    centers_px: Array['N,2', np.int64],   # h, w - unlike draw_cross_px, which takes opencv order
+    colors: Array['N,3', np.uint8],
+    cross_size: int = 3,
+):
+    """ Same pixels as calling draw_cross_px (with thickness 1) for every center, but in one numpy write.
+    The arms are exact diagonals, so there is no line rasterization to worry about. """
+    arm_size = cross_size // 2 + cross_size % 2
+    offsets = np.arange(-arm_size, arm_size + 1)
+
+    hs = centers_px[:, 0:1] + offsets
+    ws = centers_px[:, 1:2] + offsets
+    anti_ws = centers_px[:, 1:2] - offsets
+
+    # per center: the diagonal arm, then the anti-diagonal one, so later crosses overwrite earlier ones like in cv2
+    hs = np.concatenate([hs, hs], axis=1).ravel()
+    ws = np.concatenate([ws, anti_ws], axis=1).ravel()
+    colors = np.repeat(colors, 2 * len(offsets), axis=0)
+
+    inside = (hs >= 0) & (hs < image.shape[0]) & (ws >= 0) & (ws < image.shape[1])
+    image[hs[inside], ws[inside]] = colors[inside]
+    return image
+
+
+@functools.lru_cache(maxsize=None)
+def _get_circle_stamp_offsets(radius: int, thickness: int) -> Tuple[Array['K', np.int64], Array['K', np.int64]]:
+    """ (dh, dw) of all pixels cv2 paints for a circle centered at (0, 0). The pattern doesn't
+    depend on where the (integer) center is, so we rasterize it once and stamp it around. """
+    half_size = radius + thickness + 1
+    stamp = np.zeros((2 * half_size + 1, 2 * half_size + 1), dtype=np.uint8)
+    cv2.circle(stamp, (half_size, half_size), radius, 255, thickness)
+    dhs, dws = np.nonzero(stamp)
+    return dhs - half_size, dws - half_size
+
+
+def draw_circles_px(
+    image: BGRImageArray,
+    centers_px: Array['N,2', np.int64],   # h, w
+    color: BGRColor,
+    radius: int = 1,
+    thickness: int = 1,
+):
+    """ Same pixels as cv2.circle for every center, but in one numpy write. """
+    dhs, dws = _get_circle_stamp_offsets(radius, thickness)
+    hs = centers_px[:, 0:1] + dhs
+    ws = centers_px[:, 1:2] + dws
+
+    # cv2 clips thick circles a bit differently than we would, so circles touching the border go through cv2
+    fully_inside = ((hs >= 0) & (hs < image.shape[0]) & (ws >= 0) & (ws < image.shape[1])).all(axis=1)
+    image[hs[fully_inside].ravel(), ws[fully_inside].ravel()] = np.array(color, dtype=np.uint8)
+
+    for h, w in centers_px[~fully_inside]:
+        cv2.circle(image, (int(w), int(h)), radius, color, thickness)
+    return image
+
+
 if __name__ == '__main__':
     img = TextRenderer().render('heheh \npoetry of the heart \n okekoekeoke')
     import cv2
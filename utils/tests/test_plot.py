@@ -1,8 +1,9 @@
+import cv2
 import numpy as np
 
 from utils.colors import BGRCuteColors
 from utils.image import get_canvas
-from utils.plot import Row, Col, Padding, TextRenderer
+from utils.plot import Row, Col, Padding, TextRenderer, draw_cross_px, draw_crosses_px, draw_circles_px
 
 
 def test_basic_row_and_col_behaviour():
@@ -45,3 +46,29 @@ def test_generator_expression():
     data.update(data_desc)
 
     layout.render(data)
+
+
+def test_draw_crosses_matches_one_by_one_drawing():
+    rng = np.random.default_rng(0)
+    centers_px = np.stack([rng.integers(-6, 66, 30), rng.integers(-6, 86, 30)], axis=1)   # some off the image
+    colors = rng.integers(0, 256, (30, 3)).astype(np.uint8)
+
+    expected = get_canvas((60, 80, 3))
+    for (h, w), color in zip(centers_px, colors):
+        draw_cross_px(expected, (int(w), int(h)), tuple(int(c) for c in color), cross_size=7)
+
+    actual = draw_crosses_px(get_canvas((60, 80, 3)), centers_px, colors, cross_size=7)
+    assert np.array_equal(actual, expected)
+
+
+def test_draw_circles_matches_one_by_one_drawing():
+    rng = np.random.default_rng(1)
+    centers_px = np.stack([rng.integers(-8, 68, 40), rng.integers(-8, 88, 40)], axis=1)   # some touch the border
+
+    for radius, thickness in [(1, 4), (3, 1), (3, -1)]:
+        expected = get_canvas((60, 80, 3))
+        for h, w in centers_px:
+            cv2.circle(expected, (int(w), int(h)), radius, BGRCuteColors.CRIMSON, thickness)
+
+        actual = draw_circles_px(get_canvas((60, 80, 3)), centers_px, BGRCuteColors.CRIMSON, radius, thickness)
+        assert np.array_equal(actual, expected)
@@ -59,6 +59,12 @@ class SimDataStreamer(DataProvider):
     def get_initial_baselink_pose(self) -> TransformSE3:
         return self.recorded_data.initial_baselink_pose
 
+    def materialize(self) -> 'SimDataStreamer':
+        """ Same streamer, but holding only the observations that `stream` would yield.
+        Cheap to pickle over to worker processes, with no msgpack decoding on their side. """
+        recorded_data = attr.evolve(self.recorded_data, observations=list(self.stream()))
+        return attr.evolve(self, recorded_data=recorded_data)
+
     def stream(self) -> Iterable[Observation]:
 
         for i, obs in enumerate(self.recorded_data.observations):
@@ -1,6 +1,7 @@
 import collections
-import itertools
-from typing import List, Dict, Optional, Iterable
+import contextlib
+import functools
+from typing import List, Dict, Optional, Iterable, Iterator, Sequence
 
 import attr
 import numpy as np
@@ -8,16 +9,16 @@ import numpy as np
 from sim.birds_eye_view_render import DisplayBirdseyeView, BirdseyeViewSpecifier
 from sim.sim_types import CameraExtrinsics, RenderTriangle3d, CameraSpecs
 from utils.colors import BGRCuteColors
-from utils.custom_types import BGRImageArray, BGRColor, Pixel
+from utils.custom_types import Array, BGRImageArray, BGRColor, Pixel
 from utils.cv2_but_its_typed import cv2_circle
 from utils.enum_utils import StrEnum
-from utils.image import take_crop_around, magnify
-from utils.plot import Packer, Col, Row, Padding, TextRenderer, draw_cross_px
+from utils.image import take_crop_around, magnify, restore_patch_on_exit
+from utils.plot import Packer, Col, Row, Padding, TextRenderer, draw_cross_px, draw_crosses_px
 from vslam.cam import CameraIntrinsics
 from vslam.features import FeatureMatch
 from vslam.poses import SE3_pose_to_xytheta
-from vslam.transforms import px_2d_to_cam_coords_3d_homo, get_world_to_cam_coord_flip_matrix, homogenize
-from vslam.types import BGRImageArray, TransformSE3
+from vslam.transforms import px_2d_to_cam_coords_3d_homo, homogenize, CAM_TO_WORLD_FLIP
+from vslam.types import BGRImageArray, TransformSE3, Point2d, Points2d, PxCoords2d, Pose2DArray
 
 
 class GeneralDebugPanes(StrEnum):
@@ -41,9 +42,16 @@ class FeatureMatchDrawingOption(StrEnum):
     CROSS = 'cross'
 
 
+@functools.lru_cache(maxsize=None)
+def _get_uint8_color(color: BGRColor) -> Array['3', np.uint8]:
+    """ For the numpy write paths, which need the color as an array - cv2 calls take the plain tuples as they are.
+    Resolved once per color instead of per match. Don't write into the result, it's shared. """
+    return np.array(color, dtype=np.uint8)
+
+
 @attr.define
 class FeatureMatchRenderer:
-    color: BGRColor = BGRCuteColors.OFF_WHITE
+    color: BGRColor = BGRCuteColors.OFF_WHITE   # for matches without their own display color
 
     def _draw_keypoint(
             self,
@@ -64,19 +72,58 @@ class FeatureMatchRenderer:
         matches: List[FeatureMatch],
         drawing_option: FeatureMatchDrawingOption = FeatureMatchDrawingOption.CROSS
     ):
+        if drawing_option == FeatureMatchDrawingOption.CROSS:
+            # crosses are thin diagonals, so we can write all of them at once
+            if len(matches) == 0:
+                return
+            if img_type == FeatureMatchImageType.FROM:
+                keypoints_px = np.array([match.get_from_keypoint_px() for match in matches], dtype=np.int64)
+            elif img_type == FeatureMatchImageType.TO:
+                keypoints_px = np.array([match.get_to_keypoint_px() for match in matches], dtype=np.int64)
+            else:
+                return
+            default_color = _get_uint8_color(self.color)
+            colors = np.array([
+                default_color if match.display_color_or_none is None else match.display_color_or_none
+                for match in matches
+            ], dtype=np.uint8)
+            draw_crosses_px(img, keypoints_px, colors, cross_size=7)
+            return
+
         for match in matches:
-            color = BGRCuteColors.OFF_WHITE if match.display_color_or_none is None else match.display_color_or_none
+            color = self.color if match.display_color_or_none is None else match.display_color_or_none
             if img_type == FeatureMatchImageType.FROM:
                 self._draw_keypoint(img, match.get_from_keypoint_px(), color, drawing_option)
             elif img_type == FeatureMatchImageType.TO:
                 self._draw_keypoint(img, match.get_to_keypoint_px(), color, drawing_option)
 
 
+def _select_match_indices(num_matches: int, max_matches: Optional[int], stride: int) -> range:
+    """ Which matches the render generators actually draw, every stride-th one up to max_matches of them. """
+    assert stride >= 1, f'{stride=}, has to be a positive int'
+    return range(0, num_matches, stride)[:max_matches]
+
+
+def _copy_into_scratch(scratch: Optional[BGRImageArray], img: BGRImageArray) -> BGRImageArray:
+    """ np.copy, but writes into the already allocated scratch buffer if it fits.
+    The scratch is always uint8 and C-contiguous, so cv2 draws on it without converting anything. """
+    assert img.dtype == np.uint8, f'{img.dtype=}, expected uint8 BGR image'
+    if scratch is None or scratch.shape != img.shape:
+        scratch = np.empty(img.shape, dtype=np.uint8)
+    np.copyto(scratch, img)
+    return scratch
+
+
 @attr.define
 class FeatureMatchDebugger:
     ui_layout: Packer
     soft_mark_matches_on_baseline_images: bool = True
     feature_match_renderer: FeatureMatchRenderer = attr.Factory(FeatureMatchRenderer)
+    text_renderer: TextRenderer = attr.Factory(TextRenderer)
+
+    # canvases reused from frame to frame, so consume one render() before starting the next one
+    _from_canvas_img: Optional[BGRImageArray] = attr.ib(default=None, init=False, repr=False)
+    _to_canvas_img: Optional[BGRImageArray] = attr.ib(default=None, init=False, repr=False)
 
     @classmethod
     def from_defaults(cls):
@@ -98,64 +145,69 @@ class FeatureMatchDebugger:
             to_img: BGRImageArray,
             matches: List[FeatureMatch],
     ):
-        # draw the matches
-        from_canvas_img = np.copy(from_img)
-        to_canvas_img = np.copy(to_img)
+        self._from_canvas_img = _copy_into_scratch(self._from_canvas_img, from_img)
+        self._to_canvas_img = _copy_into_scratch(self._to_canvas_img, to_img)
+        from_canvas_img, to_canvas_img = self._from_canvas_img, self._to_canvas_img
 
+        # draw the matches
         if self.soft_mark_matches_on_baseline_images:
             self.feature_match_renderer.draw_soft_summary_of_feature_matches(from_canvas_img, FeatureMatchImageType.FROM, matches)
             self.feature_match_renderer.draw_soft_summary_of_feature_matches(to_canvas_img, FeatureMatchImageType.TO, matches)
 
         return from_canvas_img, to_canvas_img
 
-    def get_debug_image_dict_for_match(
+    @contextlib.contextmanager
+    def debug_image_dict_for_match(
         self,
-        from_canvas_img,
-        to_canvas_img,
-        match
-    ) -> Dict[FeatureMatchDebugPanes, BGRImageArray]:
-        from_img = np.copy(from_canvas_img)
-        to_img = np.copy(to_canvas_img)
-
+        from_canvas_img: BGRImageArray,
+        to_canvas_img: BGRImageArray,
+        match: FeatureMatch
+    ) -> Iterator[Dict[FeatureMatchDebugPanes, BGRImageArray]]:
+        """ Highlights the match directly on the canvases, instead of on full copies of them.
+        Only the patches under the highlight circles get copied, and they are put back on exit,
+        so use (e.g. lay out) the images before leaving the with block. """
         crop_from = take_crop_around(from_canvas_img, around_point=match.get_from_keypoint_px(), crop_size=(32, 32))
         crop_to = take_crop_around(to_canvas_img, around_point=match.get_to_keypoint_px(), crop_size=(32, 32))
 
-        cv2_circle(from_img, match.get_from_keypoint_px()[::-1], color=BGRCuteColors.ORANGE, radius=10, thickness=4)
-        cv2_circle(to_img, match.get_to_keypoint_px()[::-1], color=BGRCuteColors.ORANGE, radius=10, thickness=4)
+        radius, thickness = 10, 4
+        margin = radius + thickness
+
+        with restore_patch_on_exit(from_canvas_img, match.get_from_keypoint_px(), margin), \
+                restore_patch_on_exit(to_canvas_img, match.get_to_keypoint_px(), margin):
+            cv2_circle(from_canvas_img, match.get_from_keypoint_px()[::-1], color=BGRCuteColors.ORANGE, radius=radius, thickness=thickness)
+            cv2_circle(to_canvas_img, match.get_to_keypoint_px()[::-1], color=BGRCuteColors.ORANGE, radius=radius, thickness=thickness)
 
-        return {
-            FeatureMatchDebugPanes.LEFT: from_img,
-            FeatureMatchDebugPanes.RIGHT: to_img,
-            FeatureMatchDebugPanes.LEFT_CROP: magnify(crop_from, factor=4.0),
-            FeatureMatchDebugPanes.RIGHT_CROP: magnify(crop_to, factor=4.0),
-        }
+            yield {
+                FeatureMatchDebugPanes.LEFT: from_canvas_img,
+                FeatureMatchDebugPanes.RIGHT: to_canvas_img,
+                FeatureMatchDebugPanes.LEFT_CROP: magnify(crop_from, factor=4.0),
+                FeatureMatchDebugPanes.RIGHT_CROP: magnify(crop_to, factor=4.0),
+            }
 
     def render(
         self,
         from_img: BGRImageArray,
         to_img: BGRImageArray,
         matches: List[FeatureMatch],
-        depths: Optional[List[float]] = None
+        depths: Optional[List[float]] = None,
+        max_matches: Optional[int] = None,   # render at most this many matches, None for all of them
+        stride: int = 1    # render every stride-th match
     ) -> Iterable[BGRImageArray]:
 
         assert depths is None or len(depths) == len(matches), f'{len(depths)=} != {len(matches)=}'
         from_canvas_img, to_canvas_img = self.get_baseline_images(from_img, to_img, matches)
 
-        if depths is None:
-            depth_txts = [''] * len(matches)
-        else:
-            depth_txts = ['diverged' if depth is None else f'depth: {depth:.2f}' for depth in depths]
-
-        for i, (match, depth_txt) in enumerate(zip(matches, depth_txts)):
-
-            name_to_image = self.get_debug_image_dict_for_match(from_canvas_img, to_canvas_img, match)
+        for i in _select_match_indices(len(matches), max_matches, stride):
+            match = matches[i]
+            # formatted only for matches that actually get rendered
+            depth_txt = '' if depths is None else ('diverged' if depths[i] is None else f'depth: {depths[i]:.2f}')
 
             desc = f"Match {i} out of {len(matches)}. Euc dist = {match.get_pixel_distance():.2f} " \
                    f"Hamming dist = {match.get_hamming_distance():.2f} " + depth_txt
 
-            name_to_image['desc'] = TextRenderer().render(desc)
-
-            img = self.ui_layout.render(name_to_image)
+            with self.debug_image_dict_for_match(from_canvas_img, to_canvas_img, match) as name_to_image:
+                name_to_image['desc'] = self.text_renderer.render(desc)
+                img = self.ui_layout.render(name_to_image)
 
             yield img
 
@@ -164,10 +216,26 @@ class TriangulationDebugPanes(StrEnum):
     TRIANGULATION = 'triangulation'
 
 
+def _get_ray_ends_2d(
+        cam_pose: TransformSE3,
+        keypoints_px: PxCoords2d,
+        depths: List[Optional[float]],
+        camera_intrinsics: CameraIntrinsics
+) -> Points2d:
+    """ Birdseye (x, y) of each keypoint pushed out to its estimated depth, or far away if triangulation diverged. """
+    eff_depths = np.array([100.0 if depth is None else depth for depth in depths], dtype=np.float64)
+    keypoints_in_img = px_2d_to_cam_coords_3d_homo(keypoints_px, camera_intrinsics)
+    keypoints_in_cam = homogenize(eff_depths[:, None] * keypoints_in_img)
+
+    keypoints_in_world = keypoints_in_cam @ CAM_TO_WORLD_FLIP.T @ cam_pose.T
+    return keypoints_in_world[:, :2]
+
+
 @attr.define
 class TriangulationDebugger:
     ui_layout: Packer
     feature_match_debugger: FeatureMatchDebugger    # helps us show the raw feature match
+    text_renderer: TextRenderer = attr.Factory(TextRenderer)
 
     @classmethod
     def from_defaults(cls):
@@ -187,27 +255,15 @@ class TriangulationDebugger:
             feature_match_debugger=FeatureMatchDebugger.from_defaults(),
         )
 
-    def draw_triangulation_bird_eye_view(
+    def draw_triangulation_scene(
             self,
             baselink_pose: TransformSE3,
-            match: FeatureMatch,
+            left_cam_pose: TransformSE3,
+            right_cam_pose: TransformSE3,
             camera_intrinsics: CameraIntrinsics,
-            camera_extrinsics: CameraExtrinsics,
             triangles: List[RenderTriangle3d],
-            depth_or_none: Optional[float]
-    ) -> BGRImageArray:
-        """
-        Things to draw:
-        1) [X] triangles, but make the color bleaker
-        2) [X] view cones
-        NO [N] 3) baselink as a point
-        4) [ ] line from left eye's focal point to the right eye's feature
-        5) [ ] line from right eye's focal point to the left eye's feature
-        NO [ ] 6) line from baselink to intersection of the 2 above lines
-        NO [ ] 7) point at the end of line with estimated depth ???
-        8) [ ] point along left eye's line that is at estimated depth away from this eye's center
-        """
-
+    ) -> DisplayBirdseyeView:
+        """ The part of the birdseye view that is the same for every match in a frame. """
         display_renderer = DisplayBirdseyeView.from_view_specifier(
             view_specifier=BirdseyeViewSpecifier.from_view_center(
                 view_center=(baselink_pose[0, -1], baselink_pose[1, -1]),
@@ -218,50 +274,47 @@ class TriangulationDebugger:
         display_renderer.draw_triangles(triangles)
 
         display_renderer.draw_view_cone(
-            at_pose=baselink_pose @ camera_extrinsics.get_pose_of_left_cam_in_baselink(),
+            at_pose=left_cam_pose,
             camera_intrinsics=camera_intrinsics,
             whiskers_thickness_px=1
         )
         display_renderer.draw_view_cone(
-            at_pose=baselink_pose @ camera_extrinsics.get_pose_of_right_cam_in_baselink(),
+            at_pose=right_cam_pose,
             camera_intrinsics=camera_intrinsics,
             whiskers_thickness_px=1
         )
 
-        # 4) [ ] line from left eye's focal point to the left eye's feature
-        left_pose = baselink_pose @ camera_extrinsics.get_pose_of_left_cam_in_baselink()
-        left_img_keypoint_px = match.get_from_keypoint_px()
-
-        right_pose = baselink_pose @ camera_extrinsics.get_pose_of_right_cam_in_baselink()
-        right_img_keypoint_px = match.get_to_keypoint_px()
-
-        def draw_point(
-                pose,
-                keypoint_px
-        ):
-            keypoint_in_img = px_2d_to_cam_coords_3d_homo(np.array([keypoint_px]), camera_intrinsics)[0]
-            eff_depth = depth_or_none if depth_or_none is not None else 100.0
-            keypoint_in_cam = homogenize(eff_depth * keypoint_in_img)
-
-            # TODO: come on, use function
-            world_in_flip = get_world_to_cam_coord_flip_matrix().T
-            keypoint_in_cam_unflipped = world_in_flip @ keypoint_in_cam
-            keypoint_in_world = pose @ keypoint_in_cam_unflipped
-
-            start_3d = pose[:3, -1]   # write a function, comeon
-            end_3d = keypoint_in_world[:3]
+        return display_renderer
 
-            start_2d = start_3d[:2]
-            end_2d = end_3d[:2]
+    def draw_triangulation_bird_eye_view(
+            self,
+            scene_display_renderer: DisplayBirdseyeView,
+            left_cam_pose: TransformSE3,
+            right_cam_pose: TransformSE3,
+            left_ray_end_2d: Point2d,
+            right_ray_end_2d: Point2d,
+    ) -> BGRImageArray:
+        """
+        Things to draw:
+        1) [X] triangles, but make the color bleaker  (once per frame, see draw_triangulation_scene)
+        2) [X] view cones  (once per frame, see draw_triangulation_scene)
+        NO [N] 3) baselink as a point
+        4) [ ] line from left eye's focal point to the right eye's feature
+        5) [ ] line from right eye's focal point to the left eye's feature
+        NO [ ] 6) line from baselink to intersection of the 2 above lines
+        NO [ ] 7) point at the end of line with estimated depth ???
+        8) [ ] point along left eye's line that is at estimated depth away from this eye's center
 
-            display_renderer.draw_line_2d(
-                from_pt=start_2d,
-                to_pt=end_2d,
-                color=BGRCuteColors.DARK_BLUE
-            )
+        Ray ends are computed for all matches of the frame at once, see _get_ray_ends_2d.
+        """
+        display_renderer = scene_display_renderer.clone()
 
-        draw_point(left_pose, left_img_keypoint_px)
-        draw_point(right_pose, right_img_keypoint_px)
+        # 4) [ ] line from left eye's focal point to the left eye's feature (and 5) for the right one)
+        display_renderer.draw_lines_2d(
+            from_pts=np.array([left_cam_pose[:2, -1], right_cam_pose[:2, -1]]),
+            to_pts=np.array([left_ray_end_2d, right_ray_end_2d]),
+            color=BGRCuteColors.DARK_BLUE
+        )
 
         return display_renderer.get_image()
 
@@ -275,34 +328,50 @@ class TriangulationDebugger:
         camera_intrinsics: CameraIntrinsics,
         camera_extrinsics: CameraExtrinsics,
         triangles: List[RenderTriangle3d],
+        max_matches: Optional[int] = None,   # render at most this many matches, None for all of them
+        stride: int = 1    # render every stride-th match
     ) -> Iterable[BGRImageArray]:
+        """ One debug image per (selected) match. This is a generator, so nothing (not even the per frame scene) is drawn
+        until the first image is pulled, and matches that are never pulled cost nothing. """
 
         assert depths is None or len(depths) == len(matches), f'{len(depths)=} != {len(matches)=}'
         from_canvas_img, to_canvas_img = self.feature_match_debugger.get_baseline_images(from_img, to_img, matches)
 
-        if depths is None:
-            depth_txts = [''] * len(matches)
-        else:
-            depth_txts = ['diverged' if depth is None else f'depth: {depth:.2f}' for depth in depths]
+        # camera poses are the same for every match in the frame
+        left_cam_pose = baselink_pose @ camera_extrinsics.get_pose_of_left_cam_in_baselink()
+        right_cam_pose = baselink_pose @ camera_extrinsics.get_pose_of_right_cam_in_baselink()
+        scene_display_renderer = self.draw_triangulation_scene(
+            baselink_pose, left_cam_pose, right_cam_pose, camera_intrinsics, triangles
+        )
 
-        for i, (match, depth_txt, depth) in enumerate(zip(matches, depth_txts, depths)):
+        # one batched unprojection per eye instead of a tiny one per ray, only for the matches we draw
+        selected = _select_match_indices(len(matches), max_matches, stride)
+        selected_depths = [depths[i] for i in selected]
+        left_keypoints_px = np.array([matches[i].get_from_keypoint_px() for i in selected]).reshape(-1, 2)
+        right_keypoints_px = np.array([matches[i].get_to_keypoint_px() for i in selected]).reshape(-1, 2)
+        left_ray_ends_2d = _get_ray_ends_2d(left_cam_pose, left_keypoints_px, selected_depths, camera_intrinsics)
+        right_ray_ends_2d = _get_ray_ends_2d(right_cam_pose, right_keypoints_px, selected_depths, camera_intrinsics)
 
-            name_to_image = self.feature_match_debugger.get_debug_image_dict_for_match(from_canvas_img, to_canvas_img, match)
+        for k, i in enumerate(selected):
+            match = matches[i]
+            # formatted only for matches that actually get rendered
+            depth_txt = '' if depths is None else ('diverged' if depths[i] is None else f'depth: {depths[i]:.2f}')
 
             desc = f"Match {i} out of {len(matches)}. Euc dist = {match.get_pixel_distance():.2f} " \
                    f"Hamming dist = {match.get_hamming_distance():.2f} " + depth_txt
 
-            name_to_image[GeneralDebugPanes.DESC] = TextRenderer().render(desc)
-            name_to_image[TriangulationDebugPanes.TRIANGULATION] = self.draw_triangulation_bird_eye_view(
-                baselink_pose=baselink_pose,
-                match=match,
-                camera_intrinsics=camera_intrinsics,
-                camera_extrinsics=camera_extrinsics,
-                triangles=triangles,
-                depth_or_none=depth
+            triangulation_img = self.draw_triangulation_bird_eye_view(
+                scene_display_renderer=scene_display_renderer,
+                left_cam_pose=left_cam_pose,
+                right_cam_pose=right_cam_pose,
+                left_ray_end_2d=left_ray_ends_2d[k],
+                right_ray_end_2d=right_ray_ends_2d[k],
             )
 
-            img = self.ui_layout.render(name_to_image)
+            with self.feature_match_debugger.debug_image_dict_for_match(from_canvas_img, to_canvas_img, match) as name_to_image:
+                name_to_image[GeneralDebugPanes.DESC] = self.text_renderer.render(desc)
+                name_to_image[TriangulationDebugPanes.TRIANGULATION] = triangulation_img
+                img = self.ui_layout.render(name_to_image)
 
             yield img
 
@@ -323,23 +392,24 @@ class LocalisationDebugPanes(StrEnum):
 
 def _draw_pose_history(
         display_renderer: DisplayBirdseyeView,
-        pose_history: List[TransformSE3],
+        pose_2d_history: Sequence[Pose2DArray],   # e.g. the history deque itself, no need to copy it into a list
         color: BGRColor,
-        thickness: int = 1
+        thickness: int = 1,
+        circle_thickness: Optional[int] = 4,   # None for no circles
+        arrow_thickness: int = 2
 ):
-    for prev, next in itertools.pairwise(pose_history):
-        display_renderer.draw_line_2d(
-            from_pt=SE3_pose_to_xytheta(prev)[:2],
-            to_pt=SE3_pose_to_xytheta(next)[:2],
-            color=color,
-            thickness=thickness
-        )
+    poses_2d = np.array(pose_2d_history)
+
+    if len(poses_2d) > 1:
+        display_renderer.draw_polyline_2d(poses_2d[:, :2], color=color, thickness=thickness)
+
+    if circle_thickness is not None:
+        display_renderer.draw_circles(poses_2d[:, :2], color, thickness=circle_thickness)
+
+    display_renderer.draw_2d_pose(poses_2d[-1], color, thickness=arrow_thickness)
 
-    for pose_3d in pose_history:
-        pose_2d = SE3_pose_to_xytheta(pose_3d)
-        display_renderer.draw_circle(pose_2d[:2], color, thickness=4)
 
-    display_renderer.draw_3d_pose(pose_history[-1], color)
+_SCENE_MAGNIFICATION = 0.12   # the full scene is huge, we show it shrunk
 
 
 @attr.s(auto_attribs=True)
@@ -349,6 +419,14 @@ class LocalizationDebugger:
     cam_specs: CameraSpecs
     text_renderer: TextRenderer = attr.Factory(TextRenderer)
     feature_match_renderer: FeatureMatchRenderer = attr.Factory(FeatureMatchRenderer)
+    verbose: bool = False   # print per frame pandas summaries of the tracking debug data
+    _title_imgs: Optional[Dict[LocalisationDebugPanes, BGRImageArray]] = attr.ib(default=None, init=False, repr=False)
+    # canvases reused from frame to frame, the tracking close-up is only moved around to follow the robot
+    _keyframe_left_canvas_img: Optional[BGRImageArray] = attr.ib(default=None, init=False, repr=False)
+    _current_canvas_img: Optional[BGRImageArray] = attr.ib(default=None, init=False, repr=False)
+    _tracking_display_renderer: Optional[DisplayBirdseyeView] = attr.ib(default=None, init=False, repr=False)
+    # shrunk copy of scene_display_renderer, dropped whenever a keyframe draws onto the scene
+    _magnified_scene_display_renderer: Optional[DisplayBirdseyeView] = attr.ib(default=None, init=False, repr=False)
 
     # state
     keyframe_left_img: Optional[BGRImageArray] = None
@@ -360,12 +438,20 @@ class LocalizationDebugger:
     current_feature_matches_or_none: Optional[List[FeatureMatch]] = None
     estimated_pose_history: collections.deque = attr.Factory(lambda: collections.deque([], maxlen=256))
     ground_truth_pose_history: collections.deque = attr.Factory(lambda: collections.deque([], maxlen=256))
+    # x, y, theta of the poses above, converted once when they come in instead of on every render
+    _estimated_pose_2d_history: collections.deque = attr.ib(
+        factory=lambda: collections.deque([], maxlen=256), init=False, repr=False
+    )
+    _ground_truth_pose_2d_history: collections.deque = attr.ib(
+        factory=lambda: collections.deque([], maxlen=256), init=False, repr=False
+    )
 
     @classmethod
     def from_scene(
             cls,
             scene: List[RenderTriangle3d],
-            cam_specs: CameraSpecs
+            cam_specs: CameraSpecs,
+            verbose: bool = False
     ):
         scene_display_renderer = DisplayBirdseyeView.from_view_specifier(
             view_specifier=BirdseyeViewSpecifier.from_view_center(
@@ -392,9 +478,22 @@ class LocalizationDebugger:
         return cls(
             ui_layout=layout,
             scene_display_renderer=scene_display_renderer,
-            cam_specs=cam_specs
+            cam_specs=cam_specs,
+            verbose=verbose
         )
 
+    def _get_title_imgs(self) -> Dict[LocalisationDebugPanes, BGRImageArray]:
+        # titles never change, render them once
+        if self._title_imgs is None:
+            self._title_imgs = {
+                LocalisationDebugPanes.SCENE_TITLE: self.text_renderer.render('Scene & Keyframes'),
+                LocalisationDebugPanes.POSE_DIFF_TITLE: self.text_renderer.render('Pose diff'),
+                LocalisationDebugPanes.KEYFRAME_LEFT_IMG_TITLE: self.text_renderer.render('Keyframe left image'),
+                LocalisationDebugPanes.KEYFRAME_RIGHT_IMG_TITLE: self.text_renderer.render('Keyframe right image'),
+                LocalisationDebugPanes.CURRENT_IMG_TITLE: self.text_renderer.render('Current left eye image'),
+            }
+        return self._title_imgs
+
     def add_keyframe(
         self,
         keyframe_baselink_pose: TransformSE3,
@@ -407,8 +506,9 @@ class LocalizationDebugger:
         keyframe_camera_pose = keyframe_baselink_pose @ self.cam_specs.extrinsics.get_pose_of_left_cam_in_baselink()
 
         self.scene_display_renderer.draw_view_cone(at_pose=keyframe_camera_pose, camera_intrinsics=self.cam_specs.intrinsics)
+        self._magnified_scene_display_renderer = None
         self.keyframe_left_img = keyframe_left_img
-        self.keyframe_right_img = keyframe_right_img
+        self.keyframe_right_img = np.copy(keyframe_right_img)   # we draw on it, don't touch the caller's image
 
         if feature_matches_or_none is not None:
             self.feature_match_renderer.draw_soft_summary_of_feature_matches(
@@ -430,6 +530,8 @@ class LocalizationDebugger:
     ):
         self.estimated_pose_history.append(baselink_pose_estimate)
         self.ground_truth_pose_history.append(baselink_pose_groundtruth)
+        self._estimated_pose_2d_history.append(SE3_pose_to_xytheta(baselink_pose_estimate))
+        self._ground_truth_pose_2d_history.append(SE3_pose_to_xytheta(baselink_pose_groundtruth))
         self.frames_since_keyframe = frames_since_keyframe
         self.current_left_eye_image = current_left_eye_image
         self.current_right_eye_image = current_right_eye_image
@@ -437,43 +539,63 @@ class LocalizationDebugger:
         self.current_frame_no = self.current_frame_no + 1 if current_frame_no is None else current_frame_no
 
     def _prepare_tracking_closeup_display_renderer(self) -> DisplayBirdseyeView:
-        view_center = tuple(SE3_pose_to_xytheta(self.ground_truth_pose_history[-1])[:2])
-        tracking_display_renderer = DisplayBirdseyeView.from_view_specifier(
-            view_specifier=BirdseyeViewSpecifier.from_view_center(
-                view_center=view_center,
-                world_size=(2.5, 2.5),
-                resolution=0.005
-            ),
-            ground_color=BGRCuteColors.OFF_WHITE
+        view_center = tuple(self._ground_truth_pose_2d_history[-1][:2])
+        view_specifier = BirdseyeViewSpecifier.from_view_center(
+            view_center=view_center,
+            world_size=(2.5, 2.5),
+            resolution=0.005
         )
+        if self._tracking_display_renderer is None:
+            self._tracking_display_renderer = DisplayBirdseyeView.from_view_specifier(
+                view_specifier=view_specifier,
+                ground_color=BGRCuteColors.OFF_WHITE
+            )
+        else:
+            self._tracking_display_renderer.reset(view_specifier)
+        tracking_display_renderer = self._tracking_display_renderer
 
         # draw lines
         _draw_pose_history(
             display_renderer=tracking_display_renderer,
-            pose_history=list(self.estimated_pose_history),
+            pose_2d_history=self._estimated_pose_2d_history,
             color=BGRCuteColors.CRIMSON,
         )
 
         _draw_pose_history(
             display_renderer=tracking_display_renderer,
-            pose_history=list(self.ground_truth_pose_history),
+            pose_2d_history=self._ground_truth_pose_2d_history,
             color=BGRCuteColors.GRASS_GREEN,
         )
         return tracking_display_renderer
 
+    def _get_magnified_scene_display_renderer(self) -> DisplayBirdseyeView:
+        """ The scene only changes when a keyframe comes in, so we shrink it once per keyframe
+        and draw the per frame stuff straight onto the small image. """
+        if self._magnified_scene_display_renderer is None:
+            view_specifier = self.scene_display_renderer.view_specifier
+            self._magnified_scene_display_renderer = DisplayBirdseyeView(
+                view_specifier=attr.evolve(view_specifier, resolution=view_specifier.resolution / _SCENE_MAGNIFICATION),
+                canvas=magnify(self.scene_display_renderer.get_image(), _SCENE_MAGNIFICATION),
+                ground_color=self.scene_display_renderer.ground_color
+            )
+        return self._magnified_scene_display_renderer
+
     def _prepare_scene_overview_display_renderer(self) -> DisplayBirdseyeView:
-        scene_display_renderer = self.scene_display_renderer.clone()
+        scene_display_renderer = self._get_magnified_scene_display_renderer().clone()
+        # thicknesses are in pixels of the already shrunk image
         _draw_pose_history(
             display_renderer=scene_display_renderer,
-            pose_history=list(self.ground_truth_pose_history),
+            pose_2d_history=self._ground_truth_pose_2d_history,
             color=BGRCuteColors.CRIMSON,
-            thickness=5
+            thickness=2,
+            circle_thickness=None,
+            arrow_thickness=1
         )
-        scene_display_renderer.draw_3d_pose(
-            pose=self.estimated_pose_history[-1],
+        scene_display_renderer.draw_2d_pose(
+            pose_2d=self._estimated_pose_2d_history[-1],
             color=BGRCuteColors.OFF_WHITE,
             arrow_length=0.5,
-            thickness=3
+            thickness=1
         )
 
         return scene_display_renderer
@@ -482,14 +604,16 @@ class LocalizationDebugger:
         tracking_closeup_display_renderer = self._prepare_tracking_closeup_display_renderer()
         scene_display_renderer = self._prepare_scene_overview_display_renderer()
 
-        left_image = np.copy(self.keyframe_left_img)
+        self._keyframe_left_canvas_img = _copy_into_scratch(self._keyframe_left_canvas_img, self.keyframe_left_img)
+        left_image = self._keyframe_left_canvas_img
         self.feature_match_renderer.draw_soft_summary_of_feature_matches(
             img=left_image,
             img_type=FeatureMatchImageType.FROM,
             matches=self.current_feature_matches_or_none
         )
 
-        current_image = np.copy(self.current_left_eye_image)
+        self._current_canvas_img = _copy_into_scratch(self._current_canvas_img, self.current_left_eye_image)
+        current_image = self._current_canvas_img
         self.feature_match_renderer.draw_soft_summary_of_feature_matches(
             img=current_image,
             img_type=FeatureMatchImageType.TO if self.frames_since_keyframe > 0 else FeatureMatchImageType.FROM,
@@ -497,16 +621,12 @@ class LocalizationDebugger:
         )
 
         return self.ui_layout.render({
-            LocalisationDebugPanes.SCENE: magnify(scene_display_renderer.get_image(), 0.12),
+            LocalisationDebugPanes.SCENE: scene_display_renderer.get_image(),
             LocalisationDebugPanes.POSE_DIFF: tracking_closeup_display_renderer.get_image(),
             LocalisationDebugPanes.KEYFRAME_LEFT_IMG: left_image,
             LocalisationDebugPanes.KEYFRAME_RIGHT_IMG: self.keyframe_right_img,
             LocalisationDebugPanes.CURRENT_IMG: current_image,
-            LocalisationDebugPanes.SCENE_TITLE: self.text_renderer.render('Scene & Keyframes'),
-            LocalisationDebugPanes.POSE_DIFF_TITLE: self.text_renderer.render('Pose diff'),
-            LocalisationDebugPanes.KEYFRAME_LEFT_IMG_TITLE: self.text_renderer.render('Keyframe left image'),
-            LocalisationDebugPanes.KEYFRAME_RIGHT_IMG_TITLE: self.text_renderer.render('Keyframe right image'),
-            LocalisationDebugPanes.CURRENT_IMG_TITLE: self.text_renderer.render('Current left eye image'),
+            **self._get_title_imgs(),
             LocalisationDebugPanes.GENERAL_INFO_TXT: self.text_renderer.render(f"Current frame = {self.current_frame_no}")
         })
 
@@ -11,6 +11,12 @@ from utils.profiling import just_time
 from vslam.types import BGRImageArray
 
 
+def _get_keypoint_pixel_distance(from_keypoint: cv2.KeyPoint, to_keypoint: cv2.KeyPoint) -> float:
+    from_pt = from_keypoint.pt
+    to_pt = to_keypoint.pt
+    return np.sqrt((from_pt[0] - to_pt[0])**2 + (from_pt[1] - to_pt[1])**2)
+
+
 @attr.s(auto_attribs=True)
 class FeatureMatch:
     raw_match: cv2.DMatch    # trainIdx, queryIdx, distance # I am assuming hamming distance
@@ -42,9 +48,7 @@ class FeatureMatch:
         return self.raw_match.distance
 
     def get_pixel_distance(self) -> float:
-        from_pt = self.from_keypoint.pt
-        to_pt = self.to_keypoint.pt
-        return np.sqrt((from_pt[0] - to_pt[0])**2 + (from_pt[1] - to_pt[1])**2)
+        return _get_keypoint_pixel_distance(self.from_keypoint, self.to_keypoint)
 
     def get_from_keypoint_px(self) -> Pixel:
         fw, fh = self.from_keypoint.pt    # mind the opencv coord flip
@@ -98,7 +102,7 @@ class OrbBasedFeatureMatcher:
     def detect(self, img: BGRImageArray) -> OrbFeatureDetections:
         keypoints, descriptors = self.orb_feature_detector.detectAndCompute(img, None)
         return OrbFeatureDetections(
-            descriptors=descriptors,
+            descriptors=np.ascontiguousarray(descriptors, dtype=np.uint8) if descriptors is not None else None,
             keypoints=keypoints
         )
 
@@ -116,15 +120,13 @@ class OrbBasedFeatureMatcher:
         df = pd.DataFrame({'px_dists': px_dists, 'hamming_dists': hamming_dists})
         print(df.describe())
 
-    def match(
-        self,
+    @staticmethod
+    def _to_feature_matches(
+        raw_cv_matches: List[cv2.DMatch],
         left_detections: OrbFeatureDetections,
         right_detections: OrbFeatureDetections,
-        debug_matches: bool = False
     ) -> List[FeatureMatch]:
-        raw_cv_matches = self.feature_matcher.match(left_detections.descriptors, np.array(right_detections.descriptors))
-
-        matches = [
+        return [
             FeatureMatch.from_cv2_match_and_keypoints(
                 match=match,
                 from_keypoints=left_detections.keypoints,
@@ -135,14 +137,29 @@ class OrbBasedFeatureMatcher:
             for match in raw_cv_matches
         ]
 
-        if debug_matches:
-            self._describe_match_quality_distribution(matches)
+    def match(
+        self,
+        left_detections: OrbFeatureDetections,
+        right_detections: OrbFeatureDetections,
+        debug_matches: bool = False
+    ) -> List[FeatureMatch]:
+        # BFMatcher with NORM_HAMMING does the xor + popcount over the packed descriptors in SIMD C++ code,
+        # so just hand it the contiguous uint8 arrays as they are, without copies
+        raw_cv_matches = self.feature_matcher.match(left_detections.descriptors, right_detections.descriptors)
 
-        filtered_matches = [
-            match for match in matches
-            if match.get_pixel_distance() < self.max_px_distance and
-               match.get_hamming_distance() <= self.max_hamming_distance
+        if debug_matches:
+            self._describe_match_quality_distribution(self._to_feature_matches(raw_cv_matches, left_detections, right_detections))
+
+        # reject cheaply first: cv2 has already computed the hamming distance and the pixel distance is a couple
+        # of flops, so only the survivors get wrapped into FeatureMatch objects
+        passing_cv_matches = [
+            match for match in raw_cv_matches
+            if match.distance <= self.max_hamming_distance and _get_keypoint_pixel_distance(
+                left_detections.keypoints[match.queryIdx],
+                right_detections.keypoints[match.trainIdx]
+            ) < self.max_px_distance
         ]
+        filtered_matches = self._to_feature_matches(passing_cv_matches, left_detections, right_detections)
 
         sorted_matches = sorted(filtered_matches, key=lambda match: match.get_hamming_distance())
         return sorted_matches
@@ -1,3 +1,5 @@
+import itertools
+
 import attr
 import cv2
 import numpy as np
@@ -81,21 +83,17 @@ def estimate_keyframe(
             cv2.imshow('wow', img)
             cv2.waitKey(-1)
 
-    points_3d_est = []
-    feature_descriptors = []
-    keypoints = []
-    relevant_feature_matches = []
-
     assert len(depths) == len(from_kp_cam_coords_3d_homo) == len(feature_matches)
 
-    for depth_estimate, point_homo, feature_match in zip(depth_estimates, from_kp_cam_coords_3d_homo, feature_matches):
-        if depth_estimate.depth_or_none is None:
-            continue
+    # keep only matches that triangulated, and lift all of them to 3d at once
+    triangulated = np.array([depth is not None for depth in depths], dtype=bool)
+    triangulated_depths = np.array([depth for depth in depths if depth is not None], dtype=np.float64)
+    points_in_cam = homogenize(from_kp_cam_coords_3d_homo[triangulated] * triangulated_depths[:, None])
+    points_3d_est = dehomogenize(points_in_cam @ CAM_TO_WORLD_FLIP.T)
 
-        relevant_feature_matches.append(feature_match)
-        points_3d_est.append(dehomogenize(CAM_TO_WORLD_FLIP @ homogenize(point_homo * depth_estimate.depth_or_none)))
-        feature_descriptors.append(feature_match.from_feature)
-        keypoints.append(feature_match.from_keypoint)
+    relevant_feature_matches = [fm for fm, is_triangulated in zip(feature_matches, triangulated) if is_triangulated]
+    feature_descriptors = [fm.from_feature for fm in relevant_feature_matches]
+    keypoints = [fm.from_keypoint for fm in relevant_feature_matches]
 
     if debug_depth_estimation:
         depth_est_debugger = TriangulationDebugger.from_defaults()
@@ -112,9 +110,8 @@ def estimate_keyframe(
             debug_scene
         )
 
-        for i, img in enumerate(img_iterator):
-            if i > 10:
-                break
+        # render() is lazy, so the matches we don't look at are never drawn
+        for img in itertools.islice(img_iterator, 11):
             cv2.imshow('wow', img)
             cv2.waitKey(-1)
 
@@ -128,7 +125,7 @@ def estimate_keyframe(
         image=obs.left_eye_img,
         pose=left_cam_pose,
         points_3d_est=points_3d_est,
-        feature_detections=OrbFeatureDetections(np.array(feature_descriptors), keypoints)
+        feature_detections=OrbFeatureDetections(np.array(feature_descriptors, dtype=np.uint8), keypoints)
     )
 
     return keyframe, debug_data
@@ -22,7 +22,8 @@ def dot_product(x: Vector3d, y: Vector3d) -> Vector3d:
 
 
 def normalize_angle(angle):
-    return (angle + np.pi) % (2 * np.pi) - np.pi
+    # wraps into (-pi, pi], no float modulo involved
+    return np.arctan2(np.sin(angle), np.cos(angle))
 
 
 def get_difference_of_angles(theta_one: float, theta_two: float) -> float:
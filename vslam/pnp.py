@@ -7,7 +7,8 @@ from liegroups.numpy.se3 import SE3Matrix
 from utils.custom_types import Array
 from vslam.poses import correct_SE3_matrix_inplace
 from vslam.transforms import SE3_inverse, WORLD_TO_CAM_FLIP
-from vslam.types import CamFlippedWorldCoords3D, ImgCoords2d, ReprojectionErrorVector, WorldCoords3D, TransformSE3
+from vslam.types import CamFlippedWorldCoords3D, ImgCoords2d, ReprojectionErrorVector, WorldCoords3D, TransformSE3, \
+    CamCoords3d
 
 ErrorSe3PoseJacobian = Array['6,2', np.float64]
 
@@ -21,6 +22,7 @@ def estimate_J_numerically(
     """ Estimate the Jacobian of pose to reprojection error function.
     We figure out the differential, which maps small change in one of 6 camera pose degrees of freedom
     to how much the error along 2 dimensions changes.
+    Works for a single point or for a whole (N, 4) batch of points, in which case we return (N, 6, 2).
     """
 
     def err_eval(camera_pose: TransformSE3) -> ReprojectionErrorVector:
@@ -43,7 +45,7 @@ def estimate_J_numerically(
         df = (post_error - pre_error) / eps / 2.
         dfs.append(df)
 
-    J = np.array(dfs)
+    J = np.stack(dfs, axis=-2)
 
     return J
 
@@ -52,8 +54,16 @@ def estimate_J_analytically(
     point_3d: CamFlippedWorldCoords3D,
     camera_pose: TransformSE3
 ) -> ErrorSe3PoseJacobian:
-    pc = WORLD_TO_CAM_FLIP @ SE3_inverse(camera_pose) @ point_3d
-    inv_z = 1. / pc[2]
+    """ Jacobian wrt the planar (x, y, yaw) subset of pose degrees of freedom.
+    Works for a single point or for a whole (N, 4) batch of points, in which case we return (N, 3, 2). """
+    return _jacobian_of_points_in_cam(_to_cam_coords(point_3d, camera_pose))
+
+
+def _jacobian_entries_of_points_in_cam(pc: CamCoords3d) -> Tuple[Tuple[np.ndarray, ...], Tuple[np.ndarray, ...]]:
+    """ Derivatives of the error along u (first) and v (second image axis) wrt x, y, yaw,
+    as separate entries shaped like pc[..., 0] - callers decide whether to stack them or not. """
+    x, y = pc[..., 0], pc[..., 1]
+    inv_z = 1. / pc[..., 2]
     inv_z2 = inv_z * inv_z
 
     # J = np.array(([
@@ -65,13 +75,28 @@ def estimate_J_analytically(
     #     [1 + pc[0] * pc[0] * inv_z2, pc[0] * pc[1] * inv_z2],
     # ]))
 
-    J = np.array(([
-        [-pc[0] * inv_z2, -pc[1] * inv_z2],
-        [inv_z, 0],
-        [1 + pc[0] * pc[0] * inv_z2, pc[0] * pc[1] * inv_z2],
-    ]))
+    d_u = (-x * inv_z2, inv_z, 1 + x * x * inv_z2)
+    d_v = (-y * inv_z2, np.zeros_like(inv_z), x * y * inv_z2)
+    return d_u, d_v
+
+
+def _jacobian_of_points_in_cam(pc: CamCoords3d) -> ErrorSe3PoseJacobian:
+    d_u, d_v = _jacobian_entries_of_points_in_cam(pc)
+    return np.stack([np.stack(d_u, axis=-1), np.stack(d_v, axis=-1)], axis=-1)
 
-    return J
+
+def _accumulate_normal_equations(
+    points_in_cam: CamCoords3d,
+    errs: Array['N,2', np.float64]
+) -> Tuple[Array['3,3', np.float64], Array['3', np.float64]]:
+    """ Gauss-Newton normal equations H = sum J J^T and b = - sum J e.
+    We never stack the (N, 3, 2) Jacobian - each of its entries is a length N vector,
+    and we reduce over points right away. """
+    J_u, J_v = (np.array(d) for d in _jacobian_entries_of_points_in_cam(points_in_cam))   # (3, N) each
+
+    H = J_u @ J_u.T + J_v @ J_v.T
+    b = -(J_u @ errs[:, 0] + J_v @ errs[:, 1])
+    return H, b
 
 
 @attr.s(auto_attribs=True)
@@ -92,30 +117,16 @@ def gauss_netwon_pnp(
     camera_pose = camera_pose_initial_guess_in_keyframe
 
     for i in range(iterations):
-        errs = []
-        outlier_flags = []
-
-        H = np.zeros((3, 3))
-        b = np.zeros(3)
-
-        # this for loop is a bit naive, but it's fast enough, so I'm not going to touch it
-        for point_2d, point_3d in zip(points_2d_in_img, points_3d_in_keyframe):
-            # J_num = estimate_J_numerically(point_3d, point_2d, camera_pose)
-            J = estimate_J_analytically(point_3d, camera_pose)
-            e = _compute_reprojection_error(point_3d, point_2d, camera_pose)
-
-            if np.linalg.norm(e) < outlier_rejection_margin:
-                H += J @ J.T
-                b += -J @ e
-                outlier_flags.append(False)
-            else:
-                outlier_flags.append(True)
+        # transform the points once per iteration, both errors and jacobians are computed from it
+        points_in_cam = _to_cam_coords(points_3d_in_keyframe, camera_pose)
+        errs = _reprojection_error_of_points_in_cam(points_in_cam, points_2d_in_img)
+        euc_errs = np.linalg.norm(errs, axis=1)   # how much off on both axes
+        outlier_flags = ~(euc_errs < outlier_rejection_margin)   # so that nan errors count as outliers too
 
-            errs.append(e)
+        inliers = ~outlier_flags
+        H, b = _accumulate_normal_equations(points_in_cam[inliers], errs[inliers])
 
         dx = np.linalg.solve(H, b) if np.linalg.det(H) > 1e-6 else np.zeros(6)
-        errs = np.array(errs)   # reprojection error per axis
-        euc_errs = np.linalg.norm(errs, axis=1)   # how much off on both axes
         loss = euc_errs.mean()
         real_dx = np.array([dx[0], dx[1], 0, 0, 0, dx[2]])
         camera_pose = correct_SE3_matrix_inplace(camera_pose @ SE3Matrix.exp(real_dx).as_matrix())
@@ -127,19 +138,32 @@ def gauss_netwon_pnp(
 
     aux_info = GaussNetwonAuxillaryInfo(
         euclidean_errors=euc_errs,
-        outlier_flags=np.array(outlier_flags),
+        outlier_flags=outlier_flags,
         mean_euclidean_error=loss
     )
 
     return camera_pose, aux_info
 
 
+def _to_cam_coords(
+        point_3d: CamFlippedWorldCoords3D,
+        camera_pose: TransformSE3) -> CamCoords3d:
+    """ Take (homogenous) point or points into coordinates of the camera at camera_pose. """
+    inv_camera_pose = WORLD_TO_CAM_FLIP @ SE3_inverse(camera_pose)
+    R, t = inv_camera_pose[:3, :3], inv_camera_pose[:3, 3]
+    return point_3d[..., :3] @ R.T + t
+
+
+def _reprojection_error_of_points_in_cam(
+        points_in_cam: CamCoords3d,
+        point_2d: ImgCoords2d) -> ReprojectionErrorVector:
+    proj = points_in_cam[..., :2] / points_in_cam[..., 2:3]
+    return point_2d - proj
+
+
 def _compute_reprojection_error(
         point_3d: CamFlippedWorldCoords3D,
         point_2d: ImgCoords2d,
         camera_pose: TransformSE3) -> ReprojectionErrorVector:
-    """ Compute the reprojection error for a single point."""
-    pc = WORLD_TO_CAM_FLIP @ SE3_inverse(camera_pose) @ point_3d
-    proj = pc[0] / pc[2], pc[1] / pc[2]
-    e = point_2d - proj
-    return e
\ No newline at end of file
+    """ Compute the reprojection error for a single point or for a whole (N, 4) batch of points."""
+    return _reprojection_error_of_points_in_cam(_to_cam_coords(point_3d, camera_pose), point_2d)
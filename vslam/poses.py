@@ -50,8 +50,9 @@ def get_SE3_pose(
 
 
 def SE3_pose_to_xytheta(pose: TransformSE3) -> Pose2DArray:
-    theta = np.arctan2(pose[1, 0], pose[0, 0])
-    out_pose = np.array([pose[0, 3], pose[1, 3], theta])
+    """ Works for a single (4, 4) pose or for a whole (N, 4, 4) stack of them, in which case we return (N, 3). """
+    theta = np.arctan2(pose[..., 1, 0], pose[..., 0, 0])
+    out_pose = np.stack([pose[..., 0, 3], pose[..., 1, 3], theta], axis=-1)
     return out_pose
 
 
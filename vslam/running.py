@@ -12,7 +12,7 @@ from vslam.debug import LocalizationDebugger
 from vslam.frontend import FrontendTrackingResult, Frontend
 from vslam.math import get_difference_of_angles
 from vslam.poses import SE3_pose_to_xytheta
-from vslam.types import Pose2DArray
+from vslam.types import TransformSE3
 
 
 @attr.define
@@ -25,8 +25,9 @@ class SlamPerformanceMetrics:
 
 @attr.define
 class ResultRecorder:
-    est_poses: List[Pose2DArray] = attr.Factory(list)
-    gt_poses: List[Pose2DArray] = attr.Factory(list)
+    # we keep raw matrices around and convert all of them at once in emit_metrics
+    est_poses: List[TransformSE3] = attr.Factory(list)
+    gt_poses: List[TransformSE3] = attr.Factory(list)
 
     def record(
         self,
@@ -34,15 +35,12 @@ class ResultRecorder:
         frontend_resu: FrontendTrackingResult
     ):
         """ Save estimated and ground truth pose for further processing. """
-        est_pose = SE3_pose_to_xytheta(frontend_resu.baselink_pose_estimate)
-        gt_pose = SE3_pose_to_xytheta(obs.baselink_pose)
-
-        self.est_poses.append(est_pose)
-        self.gt_poses.append(gt_pose)
+        self.est_poses.append(frontend_resu.baselink_pose_estimate)
+        self.gt_poses.append(obs.baselink_pose)
 
     def emit_metrics(self) -> SlamPerformanceMetrics:
-        est_poses = np.array(self.est_poses)
-        gt_poses = np.array(self.gt_poses)
+        est_poses = SE3_pose_to_xytheta(np.array(self.est_poses))
+        gt_poses = SE3_pose_to_xytheta(np.array(self.gt_poses))
 
         gt_diffs = np.diff(gt_poses, axis=0)
         est_diffs = np.diff(est_poses, axis=0)
@@ -59,8 +57,7 @@ def _process_debug_info(
     iteration_number: int,
     frontend_resu: FrontendTrackingResult,
     obs: Observation,
-    localization_debugger: LocalizationDebugger,
-    verbose: bool = False
+    localization_debugger: LocalizationDebugger
 ) -> BGRImageArray:
     # TODO: move all of this inside Localization debugger ?
     if frontend_resu.debug_data.frames_since_keyframe == 0:
@@ -76,7 +73,8 @@ def _process_debug_info(
             feature_matches_or_none=debug_feature_matches
         )
 
-    if verbose:
+    # describe / corr are not cheap, so only when the debugger explicitly asks for it
+    if localization_debugger.verbose:
         print(iteration_number)
         print(f"est pose = {SE3_pose_to_xytheta(frontend_resu.baselink_pose_estimate).round(2)}")
         print(f"gt  pose = {SE3_pose_to_xytheta(obs.baselink_pose).round(2)}")
@@ -109,10 +107,11 @@ def run_slam_system(
     data_streamer: DataProvider,
     slam_system: Frontend,
     result_recorder: ResultRecorder,
-    localization_debugger_or_none: Optional[LocalizationDebugger]
+    localization_debugger_or_none: Optional[LocalizationDebugger],
+    show_progress: bool = True
 ) -> SlamPerformanceMetrics:
 
-    for i, obs in tqdm.tqdm(enumerate(data_streamer.stream())):
+    for i, obs in tqdm.tqdm(enumerate(data_streamer.stream()), disable=not show_progress):
         frontend_resu = slam_system.track(obs)
         result_recorder.record(obs, frontend_resu)
 
@@ -0,0 +1,61 @@
+import cv2
+import numpy as np
+import pytest
+
+from vslam.debug import FeatureMatchDebugger, FeatureMatchDebugPanes
+from vslam.features import FeatureMatch
+
+
+def _get_match(from_xy, to_xy) -> FeatureMatch:
+    return FeatureMatch(
+        raw_match=cv2.DMatch(0, 0, 10.),
+        from_keypoint=cv2.KeyPoint(from_xy[0], from_xy[1], 7.),
+        to_keypoint=cv2.KeyPoint(to_xy[0], to_xy[1], 7.),
+        from_feature=np.zeros(32, dtype=np.uint8),
+        to_feature=np.zeros(32, dtype=np.uint8),
+        display_color_or_none=(255, 255, 255)
+    )
+
+
+def test_match_highlight_is_undone_on_exit():
+    rng = np.random.default_rng(42)
+    from_img = rng.integers(0, 256, size=(120, 160, 3), dtype=np.uint8)
+    to_img = rng.integers(0, 256, size=(120, 160, 3), dtype=np.uint8)
+    # corners check that the saved patches get clipped to the image
+    matches = [_get_match((80, 60), (85, 62)), _get_match((0, 0), (159, 119)), _get_match((159, 3), (2, 117))]
+
+    debugger = FeatureMatchDebugger.from_defaults()
+    from_canvas_img, to_canvas_img = debugger.get_baseline_images(from_img, to_img, matches)
+    from_baseline, to_baseline = from_canvas_img.copy(), to_canvas_img.copy()
+
+    for match in matches:
+        with debugger.debug_image_dict_for_match(from_canvas_img, to_canvas_img, match) as name_to_image:
+            assert not np.array_equal(name_to_image[FeatureMatchDebugPanes.LEFT], from_baseline)
+            assert not np.array_equal(name_to_image[FeatureMatchDebugPanes.RIGHT], to_baseline)
+
+        assert np.array_equal(from_canvas_img, from_baseline)
+        assert np.array_equal(to_canvas_img, to_baseline)
+
+    # and the caller's images are never drawn on
+    from_img_before, to_img_before = from_img.copy(), to_img.copy()
+    assert len(list(debugger.render(from_img, to_img, matches))) == len(matches)
+    assert np.array_equal(from_img, from_img_before)
+    assert np.array_equal(to_img, to_img_before)
+
+
+def test_render_only_selected_matches():
+    rng = np.random.default_rng(42)
+    from_img = rng.integers(0, 256, size=(120, 160, 3), dtype=np.uint8)
+    to_img = rng.integers(0, 256, size=(120, 160, 3), dtype=np.uint8)
+    matches = [_get_match((10 * i + 5, 60), (10 * i + 8, 62)) for i in range(7)]
+
+    debugger = FeatureMatchDebugger.from_defaults()
+    all_imgs = list(debugger.render(from_img, to_img, matches))
+    selected_imgs = list(debugger.render(from_img, to_img, matches, max_matches=3, stride=2))
+
+    assert len(selected_imgs) == 3
+    for all_idx, img in zip([0, 2, 4], selected_imgs):
+        assert np.array_equal(img, all_imgs[all_idx])
+
+    with pytest.raises(AssertionError):
+        next(debugger.render(from_img, to_img, matches, stride=0))
@@ -0,0 +1,86 @@
+import numpy as np
+
+from vslam.pnp import estimate_J_analytically, estimate_J_numerically, gauss_netwon_pnp, _compute_reprojection_error, \
+    _accumulate_normal_equations, _to_cam_coords
+from vslam.poses import get_SE3_pose
+
+
+def _get_test_setup():
+    rng = np.random.default_rng(0)
+    points_3d = np.column_stack([
+        rng.uniform(3., 8., size=16),    # in front of the camera
+        rng.uniform(-2., 2., size=16),
+        rng.uniform(-1., 1., size=16),
+        np.ones(16)
+    ])
+    points_2d = rng.uniform(-0.5, 0.5, size=(16, 2))
+    camera_pose = get_SE3_pose(x=-0.5, y=0.2, yaw=0.05)
+    return points_3d, points_2d, camera_pose
+
+
+def test_batched_pnp_functions_agree_with_per_point():
+    points_3d, points_2d, camera_pose = _get_test_setup()
+
+    errs = _compute_reprojection_error(points_3d, points_2d, camera_pose)
+    Js = estimate_J_analytically(points_3d, camera_pose)
+
+    assert errs.shape == (16, 2)
+    assert Js.shape == (16, 3, 2)
+
+    for point_3d, point_2d, e, J in zip(points_3d, points_2d, errs, Js):
+        assert np.allclose(e, _compute_reprojection_error(point_3d, point_2d, camera_pose))
+        assert np.allclose(J, estimate_J_analytically(point_3d, camera_pose))
+
+
+def test_analytic_jacobian_matches_numeric():
+    points_3d, points_2d, camera_pose = _get_test_setup()
+
+    J = estimate_J_analytically(points_3d, camera_pose)
+    J_num = estimate_J_numerically(points_3d, points_2d, camera_pose)
+
+    # analytic jacobian covers only the planar (x, y, yaw) degrees of freedom
+    assert np.allclose(J, J_num[:, [0, 1, 5], :], atol=1e-4)
+
+
+def test_gauss_newton_recovers_planar_pose():
+    points_3d, _, camera_pose = _get_test_setup()
+    points_2d = -_compute_reprojection_error(points_3d, np.zeros((16, 2)), camera_pose)   # perfect observations
+
+    pose_estimate, aux_info = gauss_netwon_pnp(
+        camera_pose_initial_guess_in_keyframe=get_SE3_pose(),
+        points_3d_in_keyframe=points_3d,
+        points_2d_in_img=points_2d,
+        outlier_rejection_margin=np.inf
+    )
+
+    assert np.allclose(pose_estimate, camera_pose, atol=1e-6)
+    assert aux_info.outlier_flags.shape == (16,)
+    assert not aux_info.outlier_flags.any()
+
+
+def test_normal_equations_match_stacked_jacobian():
+    points_3d, points_2d, camera_pose = _get_test_setup()
+    J = estimate_J_analytically(points_3d, camera_pose)
+    errs = _compute_reprojection_error(points_3d, points_2d, camera_pose)
+
+    H, b = _accumulate_normal_equations(_to_cam_coords(points_3d, camera_pose), errs)
+
+    assert np.allclose(H, sum(J_i @ J_i.T for J_i in J))
+    assert np.allclose(b, -sum(J_i @ e for J_i, e in zip(J, errs)))
+
+
+def test_gauss_newton_treats_nan_errors_as_outliers():
+    points_3d, _, camera_pose = _get_test_setup()
+    points_2d = -_compute_reprojection_error(points_3d, np.zeros((16, 2)), camera_pose)
+    points_2d[3] = np.nan
+
+    pose_estimate, aux_info = gauss_netwon_pnp(
+        camera_pose_initial_guess_in_keyframe=get_SE3_pose(x=-0.49, y=0.2, yaw=0.05),
+        points_3d_in_keyframe=points_3d,
+        points_2d_in_img=points_2d,
+        outlier_rejection_margin=0.05
+    )
+
+    assert np.allclose(pose_estimate, camera_pose, atol=1e-6)
+    assert aux_info.outlier_flags[3]
+    assert aux_info.outlier_flags.sum() == 1